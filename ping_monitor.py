@@ -8,102 +8,657 @@ GitHub: https://github.com/Lee-Robinson/ping-monitor
 """
 
 import subprocess
+import collections
+import contextlib
 import datetime
+import ipaddress
 import time
 import signal
+import socket
+import sqlite3
+import struct
 import sys
 import os
 import json
 import platform
+import queue
+import re
 import threading
 
+# fdatasync skips the inode metadata update where the OS supports it
+_sync_data = getattr(os, "fdatasync", os.fsync)
+
+# Marks a reply line in ping output; "TTL=" is not translated in any locale
+_PING_REPLY_RE = re.compile(rb"ttl=", re.IGNORECASE)
+
+# Custom duration input: optional days, hours and minutes parts, in that order
+_DURATION_RE = re.compile(
+    r"(?:(\d*\.?\d+)\s*d(?:ays?)?)?\s*"
+    r"(?:(\d*\.?\d+)\s*h(?:ours?|rs?)?)?\s*"
+    r"(?:(\d*\.?\d+)\s*m(?:inutes?|ins?)?)?"
+)
+
+# Sequence number in ping output: "icmp_seq=5", "icmp_seq 5" (macOS timeouts), "seq=5" (busybox)
+_PING_SEQ_RE = re.compile(rb"seq[= ](\d+)")
+
+# Seconds between pings; the Windows ping command can only do 1
+PING_INTERVAL = 1
+
+# Seconds to wait for a reply before counting a ping as dropped
+PING_TIMEOUT = 3
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Drop log entry; the log is written in binary, so use the platform's line ending explicitly
+_LOG_DROP_LINE = "%s - Packet drop detected (consecutive: %d)" + os.linesep
+
+# Seconds between HTML report refreshes while monitoring
+REPORT_INTERVAL = 60
+
+# The report table lists at most this many of the most recent drops
+REPORT_DROP_ROWS = 1000
+
+# Servers offered by select_server: (IP, name, description)
+SERVERS = (
+    ("8.8.8.8", "Google DNS Primary", "Reliable, global coverage"),
+    ("8.8.4.4", "Google DNS Secondary", "Backup Google DNS"),
+    ("1.1.1.1", "Cloudflare DNS Primary", "Fast, privacy-focused"),
+    ("1.0.0.1", "Cloudflare DNS Secondary", "Backup Cloudflare DNS"),
+    ("9.9.9.9", "Quad9 DNS", "Security and privacy focused"),
+    ("208.67.222.222", "OpenDNS", "Family-safe DNS filtering"),
+    ("208.67.220.220", "OpenDNS Secondary", "Backup OpenDNS")
+)
+
+# Durations offered by select_duration: (hours, description); None runs until stopped
+DURATIONS = (
+    (0.5, "30 minutes"),
+    (1, "1 hour"),
+    (2, "2 hours"),
+    (4, "4 hours"),
+    (8, "8 hours"),
+    (12, "12 hours"),
+    (24, "24 hours (1 day)"),
+    (48, "48 hours (2 days)"),
+    (None, "Continuous (until stopped manually)"),
+    ("custom", "Custom duration")
+)
+
+# Friendly names for common DNS servers
+_TARGET_NAMES = {ip: name for ip, name, _ in SERVERS}
+
+# Startup banner, written in one call by main()
+_BANNER = "\n".join([
+    "=" * 70,
+    "  PING MONITOR - Network Connectivity Testing Tool",
+    "  Written by Lee Robinson",
+    "  GitHub: https://github.com/Lee-Robinson",
+    "  Repository: https://github.com/Lee-Robinson/ping-monitor",
+    "=" * 70,
+    ""
+])
+
+# Messages printed by main() when the user backs out
+_MSG_CANCELLED = "❌ Test cancelled by user."
+_MSG_INTERRUPTED = "\n❌ Test interrupted by user."
+
+# Progress bar blocks, sliced to length by get_progress_bar (widths up to 100)
+_BAR_FULL = "█" * 100
+_BAR_EMPTY = "░" * 100
+
+# Pre-bound %-formatters for the report tables; each takes one row tuple
+_DROP_ROW = '<tr><td>%s</td><td>%d</td><td>%s</td></tr>'.__mod__
+_HOUR_ROW = '<tr><td>%s</td><td>%d</td></tr>'.__mod__
+
+# Static parts of the HTML report, encoded once and written verbatim by generate_report
+_REPORT_STYLE = """\
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; background-color: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .header { background-color: #2c3e50; color: white; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
+        .config-summary { background-color: #3498db; color: white; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+        .system-info { background-color: #ecf0f1; padding: 10px; border-radius: 5px; margin-bottom: 20px; font-size: 14px; }
+        .stats { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin-bottom: 30px; }
+        .stat-box { background-color: #ecf0f1; padding: 15px; border-radius: 5px; text-align: center; }
+        .stat-number { font-size: 24px; font-weight: bold; color: #2c3e50; }
+        .stat-label { color: #7f8c8d; margin-top: 5px; }
+        .drops-table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        .drops-table th, .drops-table td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+        .drops-table th { background-color: #34495e; color: white; }
+        .drops-table tr:nth-child(even) { background-color: #f9f9f9; }
+        .alert { background-color: #e74c3c; color: white; padding: 10px; border-radius: 5px; margin-bottom: 20px; }
+        .success { background-color: #27ae60; color: white; padding: 10px; border-radius: 5px; margin-bottom: 20px; }
+        .hourly-analysis { margin-top: 30px; }
+        .hourly-table { width: 100%; border-collapse: collapse; }
+        .hourly-table th, .hourly-table td { border: 1px solid #ddd; padding: 8px; text-align: center; }
+        .hourly-table th { background-color: #3498db; color: white; }
+        .footer { margin-top: 30px; text-align: center; color: #7f8c8d; font-size: 12px; }
+    </style>
+""".encode('utf-8')
+
+_REPORT_GUIDE = """\
+        <div style="margin-top: 30px; padding: 15px; background-color: #ecf0f1; border-radius: 5px;">
+            <h3>📊 Packet Loss Interpretation Guide</h3>
+            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 15px; margin-top: 15px;">
+                <div style="background-color: #27ae60; color: white; padding: 12px; border-radius: 5px;">
+                    <h4 style="margin: 0 0 8px 0;">🟢 Excellent (99.9%+ success)</h4>
+                    <p style="margin: 0; font-size: 14px;"><strong>0-0.1% packet loss</strong><br>
+                    Normal operation. Occasional single drops expected during network maintenance or brief congestion. No action needed.</p>
+                </div>
+                <div style="background-color: #f39c12; color: white; padding: 12px; border-radius: 5px;">
+                    <h4 style="margin: 0 0 8px 0;">🟡 Good (99.0-99.9% success)</h4>
+                    <p style="margin: 0; font-size: 14px;"><strong>0.1-1% packet loss</strong><br>
+                    Minor issues, possibly during peak usage. Monitor for patterns. Generally acceptable for most uses.</p>
+                </div>
+                <div style="background-color: #e67e22; color: white; padding: 12px; border-radius: 5px;">
+                    <h4 style="margin: 0 0 8px 0;">🟠 Fair (95.0-99.0% success)</h4>
+                    <p style="margin: 0; font-size: 14px;"><strong>1-5% packet loss</strong><br>
+                    Noticeable issues affecting streaming, gaming, video calls. Contact ISP if persistent, especially during off-peak hours.</p>
+                </div>
+                <div style="background-color: #e74c3c; color: white; padding: 12px; border-radius: 5px;">
+                    <h4 style="margin: 0 0 8px 0;">🔴 Poor (<95% success)</h4>
+                    <p style="margin: 0; font-size: 14px;"><strong>>5% packet loss</strong><br>
+                    Significant problems affecting all internet usage. Immediate ISP contact required - indicates serious network issues.</p>
+                </div>
+            </div>
+            
+            <div style="margin-top: 20px; padding: 15px; background-color: white; border-radius: 5px; border-left: 4px solid #3498db;">
+                <h4 style="margin: 0 0 10px 0; color: #2c3e50;">💡 Important Notes:</h4>
+                <ul style="margin: 0; padding-left: 20px; color: #2c3e50;">
+                    <li><strong>100% success is unrealistic</strong> - Network equipment maintenance, routing changes, and brief congestion cause occasional drops</li>
+                    <li><strong>WiFi connections</strong> typically have slightly higher loss rates than wired connections</li>
+                    <li><strong>Peak hours</strong> (7-11 PM) may show increased packet loss due to network congestion</li>
+                    <li><strong>Patterns matter more than totals</strong> - Consistent drops at specific times indicate issues worth investigating</li>
+                    <li><strong>Burst losses</strong> (many consecutive drops) are more concerning than scattered single drops</li>
+                </ul>
+            </div>
+            
+""".encode('utf-8')
+
+# Network quality by minimum success rate (%), best first: (threshold, summary text, report text)
+_QUALITY = (
+    (99.9, "🟢 EXCELLENT - No significant issues detected", "🟢 Excellent network quality"),
+    (99.0, "🟡 GOOD - Minor connectivity issues", "🟡 Good network quality with minor issues"),
+    (95.0, "🟠 FAIR - Noticeable connectivity problems", "🟠 Fair network quality - monitor for patterns"),
+    (0.0, "🔴 POOR - Significant connectivity issues", "🔴 Poor network quality - contact ISP immediately")
+)
+
+def classify_quality(success_rate):
+    """Return the (summary text, report text) quality labels for a success rate"""
+    for threshold, summary, report in _QUALITY:
+        if success_rate >= threshold:
+            return summary, report
+    return _QUALITY[-1][1:]
+
+def icmp_checksum(data):
+    """RFC 1071 internet checksum"""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+class IcmpSocket:
+    """Reusable ICMP echo socket, so each ping is a sendto/recvfrom instead of a new process"""
+    ECHO_REQUEST = 8
+    ECHO_REPLY = 0
+    PAYLOAD = bytes(range(56))
+    
+    def __init__(self):
+        try:
+            # Unprivileged ICMP (Linux with ping_group_range, macOS)
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self.raw = False
+        except OSError:
+            # Raw socket needs root/Administrator; raises if we don't have it
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.raw = True
+        self.ident = os.getpid() & 0xFFFF
+        # Linux datagram sockets rewrite the identifier and only deliver our own replies;
+        # raw sockets and macOS datagram sockets see every echo reply
+        self.check_ident = self.raw or sys.platform != "linux"
+    
+    def send(self, address, sequence):
+        """Send one echo request"""
+        header = struct.pack("!BBHHH", self.ECHO_REQUEST, 0, 0, self.ident, sequence)
+        checksum = icmp_checksum(header + self.PAYLOAD)
+        header = struct.pack("!BBHHH", self.ECHO_REQUEST, 0, checksum, self.ident, sequence)
+        self.sock.sendto(header + self.PAYLOAD, (address, 0))
+    
+    def receive(self, address, timeout):
+        """Wait up to timeout seconds for an echo reply from address and return its sequence, or None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.sock.settimeout(remaining)
+            try:
+                data, source = self.sock.recvfrom(1024)
+            except socket.timeout:
+                return None
+            # Raw sockets (and macOS datagram sockets) include the IPv4 header
+            if data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8 or source[0] != address:
+                continue
+            icmp_type, _, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+            if icmp_type == self.ECHO_REPLY and (ident == self.ident or not self.check_ident):
+                return seq
+    
+    def close(self):
+        self.sock.close()
+
+def get_target_name(ip):
+    """Get friendly name for common DNS servers"""
+    return _TARGET_NAMES.get(ip, f"Custom Server ({ip})")
+
 class PingMonitor:
-    def __init__(self, target="8.8.8.8", duration=None, log_file="ping_drops.log", report_file="ping_report.html"):
+    # Fixed attribute layout: no per-instance __dict__, and slot lookups on the hot path
+    __slots__ = (
+        "target", "resolved_ip", "target_name", "duration",
+        "log_file", "report_file", "db_file",
+        "total_pings", "dropped_pings", "consecutive_drops", "max_consecutive_drops",
+        "start_time", "start_monotonic", "_duration_seconds", "end_time", "running",
+        "_plat", "os_type", "_icmp_socket", "_send_failing", "_next_seq", "_outstanding",
+        "_ping_proc", "_ping_results", "_ping_started", "_last_result", "_one_shot",
+        "_log_fp", "_db", "_stop_reports", "hourly_drops", "_stats_lock",
+        "_pending_drops", "_last_flush", "_ts_second", "_ts_text"
+    )
+    
+    def __init__(self, target="8.8.8.8", duration=None, log_file="ping_drops.log", report_file="ping_report.html", db_file=None, resolved_ip=None):
         self.target = target
-        self.target_name = self.get_target_name(target)
+        self.resolved_ip = resolved_ip or self.resolve_target(target)  # Pinged address, resolved once
+        self.target_name = get_target_name(target)
         self.duration = duration  # Duration in hours, None for continuous
         self.log_file = log_file
         self.report_file = report_file
+        self.db_file = db_file or os.path.splitext(log_file)[0] + ".db"
         self.total_pings = 0
         self.dropped_pings = 0
         self.consecutive_drops = 0
         self.max_consecutive_drops = 0
         self.start_time = datetime.datetime.now()
+        self.start_monotonic = time.monotonic()  # Immune to wall clock changes
+        self._duration_seconds = duration * 3600 if duration else None
         self.end_time = None
-        self.drops_log = []
         self.running = True
-        self.os_type = platform.system().lower()
+        # Platform details don't change while running, so look them up once
+        self._plat = (platform.system(), platform.release(), platform.python_version(), platform.node())
+        self.os_type = self._plat[0].lower()
+        self._icmp_socket = self.open_icmp_socket()
+        self._send_failing = False  # Send errors are reported once per outage
+        self._next_seq = 0
+        self._outstanding = {}  # Sequence -> [sent at (monotonic), sent at (Unix time), replied], oldest first
+        self._ping_proc = None
+        self._ping_results = None
+        self._ping_started = 0
+        self._last_result = 0
+        self._one_shot = False  # One ping command per interval, when a continuous one won't run
+        self._log_fp = None
+        self._db = None
+        self._stop_reports = threading.Event()
+        self.hourly_drops = collections.Counter()  # Drops per local hour, kept up to date by log_drop
+        self._stats_lock = threading.Lock()  # Guards hourly_drops against the report thread
+        self._pending_drops = 0
+        self._last_flush = time.monotonic()
+        self._ts_second = None  # Second last formatted by format_timestamp
+        self._ts_text = None
         
         # Setup signal handler for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
         if self.os_type != "windows":
             signal.signal(signal.SIGTERM, self.signal_handler)
     
-    def get_target_name(self, ip):
-        """Get friendly name for common DNS servers"""
-        names = {
-            "8.8.8.8": "Google DNS Primary",
-            "8.8.4.4": "Google DNS Secondary", 
-            "1.1.1.1": "Cloudflare DNS Primary",
-            "1.0.0.1": "Cloudflare DNS Secondary",
-            "9.9.9.9": "Quad9 DNS",
-            "208.67.222.222": "OpenDNS",
-            "208.67.220.220": "OpenDNS Secondary"
-        }
-        return names.get(ip, f"Custom Server ({ip})")
+    @staticmethod
+    def resolve_target(target):
+        """Resolve a hostname to an IPv4 address once, or return target unchanged if it can't be"""
+        try:
+            return socket.gethostbyname(target)
+        except OSError:
+            return target
     
     def signal_handler(self, signum, frame):
         print(f"\nReceived signal {signum}. Shutting down gracefully...")
         self.running = False
     
-    def ping_once(self):
-        """Execute a single ping and return True if successful, False if dropped"""
+    def open_icmp_socket(self):
+        """Open a reusable ICMP socket, or None to use the ping command"""
         try:
-            if self.os_type == "windows":
-                # Windows ping command
-                result = subprocess.run(
-                    ['ping', '-n', '1', '-w', '3000', self.target],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-            else:
-                # macOS/Linux ping command
-                result = subprocess.run(
-                    ['ping', '-c', '1', '-W', '3000', self.target],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-            return result.returncode == 0
+            return IcmpSocket()
+        except OSError:
+            return None
+    
+    def send_ping(self):
+        """Start the next ping without waiting for its result"""
+        if self._icmp_socket is not None:
+            seq = self._next_seq
+            self._next_seq = (seq + 1) & 0xFFFF
+            self._outstanding[seq] = [time.monotonic(), time.time(), False]
+            try:
+                self._icmp_socket.send(self.resolved_ip, seq)
+                self._send_failing = False
+            except OSError as e:
+                # Left outstanding, so it times out as a drop. While the link is down
+                # this fails on every ping (ENETUNREACH), so only report the first
+                if not self._send_failing:
+                    print(f"Error executing ping: {e}")
+                    self._send_failing = True
+        elif self._one_shot:
+            seq = self._next_seq
+            self._next_seq = seq + 1
+            self._outstanding[seq] = [time.monotonic(), time.time(), False]
+            threading.Thread(target=self.ping_once, args=(seq, self._ping_results), daemon=True).start()
+        elif self._ping_proc is None:
+            # No ICMP socket: the long-running ping process sends pings on its own
+            try:
+                self.start_ping_process()
+            except Exception as e:
+                print(f"Error executing ping: {e}")
+    
+    def collect_results(self, deadline):
+        """Wait until deadline for replies; return (success, sent at) of finished pings in send order"""
+        if self._icmp_socket is not None:
+            while not all(replied for _, _, replied in self._outstanding.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    seq = self._icmp_socket.receive(self.resolved_ip, remaining)
+                except OSError as e:
+                    print(f"Error receiving ping reply: {e}")
+                    break
+                if seq is None:
+                    break
+                if seq in self._outstanding:
+                    self._outstanding[seq][2] = True
+            return self.finished_pings()
+        
+        if self._ping_proc is None and not self._one_shot:
+            self.add_missed_ping(time.time())  # Couldn't start the ping process
+            return self.finished_pings()
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                report = self._ping_results.get(timeout=remaining) if remaining > 0 else self._ping_results.get_nowait()
+            except queue.Empty:
+                break
+            if report is None:
+                self._ping_proc.wait()  # Reap it, then restart it on the next ping
+                self._ping_proc = None
+                if self._last_result == self._ping_started and time.monotonic() - self._ping_started < PING_TIMEOUT:
+                    # Exited at once without reporting a ping, e.g. busybox ping has no -O
+                    print("Continuous ping is not supported here; running one ping command per interval instead")
+                    self._one_shot = True
+                elif self.running:
+                    self.add_missed_ping(time.time())  # Not when it was stopped along with us
+                break
+            self.track_ping_report(*report)
+            self._last_result = time.monotonic()
+        
+        # A silent ping process counts as dropped pings too, one per interval
+        if self._ping_proc is not None and time.monotonic() - self._last_result > PING_INTERVAL + PING_TIMEOUT:
+            self.add_missed_ping(time.time() - PING_TIMEOUT)
+            self._last_result += PING_INTERVAL
+        return self.finished_pings()
+    
+    def finished_pings(self):
+        """Remove and return (success, sent at) of finished pings in send order"""
+        # Pings finish in order: replied, or unanswered for PING_TIMEOUT seconds
+        results = []
+        now = time.monotonic()
+        while self._outstanding:
+            seq, (sent_at, sent_time, replied) = next(iter(self._outstanding.items()))
+            if not replied and now - sent_at < PING_TIMEOUT:
+                break
+            del self._outstanding[seq]
+            results.append((replied, sent_time))
+        return results
+    
+    def track_ping_report(self, seq, at, replied):
+        """Track a ping process report for seq: a reply arriving at monotonic time at, or a timeout of a ping sent at at"""
+        entry = self._outstanding.get(seq)
+        if entry is not None:
+            # A late reply only counts if it came within PING_TIMEOUT of the ping
+            if replied and at - entry[0] < PING_TIMEOUT:
+                entry[2] = True
+            return
+        if seq < self._next_seq:
+            return  # Already finished
+        
+        # Pings the process skipped over went out one interval apart before this one
+        wall_offset = time.time() - time.monotonic()
+        for missed in range(self._next_seq, seq):
+            sent_at = at - (seq - missed) * PING_INTERVAL
+            self._outstanding[missed] = [sent_at, sent_at + wall_offset, False]
+        self._outstanding[seq] = [at, at + wall_offset, replied]
+        self._next_seq = seq + 1
+    
+    def add_missed_ping(self, sent_time):
+        """Track a ping sent at Unix time sent_time that the process never reported, as already timed out"""
+        self._outstanding[self._next_seq] = [time.monotonic() - PING_TIMEOUT, sent_time, False]
+        self._next_seq += 1
+    
+    def drain_results(self):
+        """Wait for pings still in flight when monitoring stops and record their results"""
+        stop_time = time.time()
+        # A continuous ping process only reports a ping once it replies or times out
+        listen_until = time.monotonic() + PING_INTERVAL + PING_TIMEOUT if self._ping_proc is not None else 0
+        while time.monotonic() < listen_until or any(sent_time <= stop_time for _, sent_time, _ in self._outstanding.values()):
+            if self._icmp_socket is None and not self._one_shot and self._ping_proc is None:
+                break  # The ping process is gone, so nothing more will be reported
+            for success, sent_time in self.collect_results(time.monotonic() + PING_INTERVAL):
+                if sent_time <= stop_time:
+                    self.record_result(success, sent_time)
+    
+    def record_result(self, success, sent_time):
+        """Update statistics and output for one finished ping sent at Unix time sent_time"""
+        self.total_pings += 1
+        
+        if success:
+            # Successful ping
+            if self.consecutive_drops > 0:
+                print(f"✅ Connection restored after {self.consecutive_drops} drops")
+                self.consecutive_drops = 0
+            
+            # Print status every 60 pings (about 1 minute)
+            if self.total_pings % 60 == 0:
+                elapsed_seconds = time.monotonic() - self.start_monotonic
+                minutes, seconds = divmod(int(elapsed_seconds), 60)
+                hours, minutes = divmod(minutes, 60)
+                elapsed_str = f"{hours}:{minutes:02d}:{seconds:02d}"
+                success_rate = (self.total_pings - self.dropped_pings) / self.total_pings * 100
+                status = f"{self.total_pings} pings, {self.dropped_pings} drops ({success_rate:.1f}% success)"
+                
+                if self.duration:
+                    # Calculate remaining time and progress
+                    remaining_seconds = self._duration_seconds - elapsed_seconds
+                    remaining_hours = remaining_seconds / 3600 if remaining_seconds > 0 else 0
+                    remaining_str = self.format_time_remaining(remaining_hours)
+                    progress_bar = self.get_progress_bar(elapsed_seconds, self._duration_seconds)
+                    lines = [
+                        f"📊 {progress_bar}",
+                        f"📈 Status: {status}",
+                        f"⏱️  Elapsed: {elapsed_str} | Remaining: {remaining_str}"
+                    ]
+                else:
+                    lines = [f"📊 Status: {status} | Elapsed: {elapsed_str}"]
+                
+                # One write for the whole block instead of a print per line
+                lines.append("-" * 60)
+                sys.stdout.write("\n".join(lines) + "\n")
+        
+        else:
+            # Dropped ping
+            self.dropped_pings += 1
+            consecutive = self.consecutive_drops = self.consecutive_drops + 1
+            if consecutive > self.max_consecutive_drops:
+                self.max_consecutive_drops = consecutive
+            
+            print(f"❌ {self.format_timestamp(sent_time)[11:]} - Packet drop detected (consecutive: {consecutive})")
+            self.log_drop(sent_time)
+    
+    def ping_command(self):
+        """Build the command line for a continuous ping process"""
+        if self.os_type == "windows":
+            # Windows ping command (fixed 1 second interval)
+            return ['ping', '-t', '-w', '3000', self.resolved_ip]
+        elif self.os_type == "linux":
+            # -O reports each unanswered ping instead of staying silent
+            return ['ping', '-O', self.resolved_ip]
+        else:
+            # macOS/BSD ping reports "Request timeout" on its own
+            return ['ping', self.resolved_ip]
+    
+    def ping_process_options(self):
+        """Popen options that keep a ping child out of the terminal's Ctrl+C, which stop_ping_process handles"""
+        if self.os_type == "windows":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True, "env": dict(os.environ, LC_ALL="C")}  # Untranslated output
+    
+    def start_ping_process(self):
+        """Spawn one continuous ping process and a thread that reads its output"""
+        self._ping_proc = subprocess.Popen(
+            self.ping_command(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            **self.ping_process_options()
+        )
+        self._ping_results = queue.SimpleQueue()
+        self._ping_started = self._last_result = time.monotonic()
+        threading.Thread(
+            target=self.read_ping_output,
+            args=(self._ping_proc, self._ping_results, self._next_seq),
+            daemon=True
+        ).start()
+    
+    def read_ping_output(self, proc, results, first_seq):
+        """Queue (sequence, time, replied) for each reply or timeout in the ping output"""
+        if self.os_type == "windows":
+            # Output is localized and has no sequence numbers, but after the
+            # "Pinging ..." header every line reports one ping, after its timeout at most,
+            # up to the blank line before the statistics block
+            seq = first_seq
+            header = True
+            for line in proc.stdout:
+                if not line.strip():
+                    if header:
+                        continue
+                    break
+                if header:
+                    header = False
+                    continue
+                now = time.monotonic()
+                replied = _PING_REPLY_RE.search(line) is not None
+                results.put((seq, now if replied else now - PING_TIMEOUT, replied))
+                seq += 1
+            results.put(None)
+            return
+        
+        # The process's sequence numbers are 16-bit and start anywhere; number them from first_seq
+        last_raw = last_seq = None
+        for line in proc.stdout:
+            now = time.monotonic()
+            seq_match = _PING_SEQ_RE.search(line)
+            if not seq_match:
+                continue
+            replied = _PING_REPLY_RE.search(line) is not None
+            raw = int(seq_match.group(1))
+            seq = first_seq if last_raw is None else last_seq + ((raw - last_raw + 0x8000) & 0xFFFF) - 0x8000
+            last_raw, last_seq = raw, seq
+            if seq < first_seq:
+                continue  # Late line for a ping before the first one seen
+            # Timeouts are reported one interval after the ping went out (-O, macOS)
+            results.put((seq, now if replied else now - PING_INTERVAL, replied))
+        results.put(None)
+    
+    def ping_once_command(self):
+        """Build the command line for a single ping"""
+        if self.os_type == "windows":
+            return ['ping', '-n', '1', '-w', '3000', self.resolved_ip]
+        elif self.os_type == "linux":
+            # iputils and busybox take -W in seconds
+            return ['ping', '-c', '1', '-W', f"{PING_TIMEOUT:g}", self.resolved_ip]
+        else:
+            # macOS/BSD take -W in milliseconds
+            return ['ping', '-c', '1', '-W', f"{PING_TIMEOUT * 1000:g}", self.resolved_ip]
+    
+    def ping_once(self, seq, results):
+        """Run one ping command and queue its result the way read_ping_output does"""
+        try:
+            result = subprocess.run(
+                self.ping_once_command(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=PING_TIMEOUT + 2,
+                **self.ping_process_options()
+            )
+            replied = result.returncode == 0
         except subprocess.TimeoutExpired:
-            return False
-        except Exception as e:
+            replied = False
+        except OSError as e:
             print(f"Error executing ping: {e}")
-            return False
+            replied = False
+        results.put((seq, time.monotonic(), replied))
+    
+    def stop_ping_process(self):
+        """Terminate the continuous ping process if one is running"""
+        if self._ping_proc is not None:
+            self._ping_proc.terminate()
+            self._ping_proc.wait()
+            self._ping_proc = None
+    
+    def format_timestamp(self, ts):
+        """Format Unix timestamp ts with TIME_FORMAT, reusing the result within the same second"""
+        second = int(ts)
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_text = time.strftime(TIME_FORMAT, time.localtime(second))
+        return self._ts_text
     
-    def log_drop(self, timestamp):
-        """Log a packet drop with timestamp"""
-        drop_entry = {
-            'timestamp': timestamp.isoformat(),
-            'formatted_time': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'consecutive_count': self.consecutive_drops
-        }
-        self.drops_log.append(drop_entry)
+    def log_drop(self, ts):
+        """Log a packet drop at Unix timestamp ts"""
+        consecutive = self.consecutive_drops
+        formatted_time = self.format_timestamp(ts)
+        self._db.execute("INSERT INTO drops (ts, consec) VALUES (?, ?)", (ts, consecutive))
+        with self._stats_lock:
+            self.hourly_drops[formatted_time[:13]] += 1  # YYYY-MM-DD HH
         
-        # Write to log file immediately
-        with open(self.log_file, 'a') as f:
-            f.write(f"{drop_entry['formatted_time']} - Packet drop detected (consecutive: {self.consecutive_drops})\n")
+        # Buffered write, synced to disk in batches by flush_log
+        self._log_fp.write((_LOG_DROP_LINE % (formatted_time, consecutive)).encode('ascii'))
+        self._pending_drops += 1
+        self.flush_log()
+    
+    def open_database(self):
+        """Create a fresh drop database in WAL mode"""
+        self._db = sqlite3.connect(self.db_file)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("DROP TABLE IF EXISTS drops")
+        self._db.execute("CREATE TABLE drops (ts REAL NOT NULL, consec INTEGER NOT NULL)")
+        self._db.commit()
+    
+    def flush_log(self, force=False):
+        """Commit and sync buffered drop entries every 32 drops or 5 seconds"""
+        if not self._pending_drops:
+            return
+        now = time.monotonic()
+        if force or self._pending_drops >= 32 or now - self._last_flush > 5:
+            self._db.commit()
+            self._log_fp.flush()
+            _sync_data(self._log_fp.fileno())
+            self._pending_drops = 0
+            self._last_flush = now
     
     def check_duration(self):
         """Check if test duration has been reached"""
-        if self.duration is None:
+        if self._duration_seconds is None:
             return False  # Run continuously
         
-        elapsed_hours = (datetime.datetime.now() - self.start_time).total_seconds() / 3600
-        return elapsed_hours >= self.duration
+        return time.monotonic() - self.start_monotonic >= self._duration_seconds
     
-    def format_duration(self, hours):
+    @staticmethod
+    def format_duration(hours):
         """Format duration for display"""
         if hours is None:
             return "Continuous"
@@ -126,7 +681,8 @@ class PingMonitor:
             else:
                 return f"{hours:.1f} hour{'s' if hours != 1 else ''}"
     
-    def format_time_remaining(self, hours):
+    @staticmethod
+    def format_time_remaining(hours):
         """Format remaining time with hours and minutes"""
         if hours <= 0:
             return "0 minutes"
@@ -142,66 +698,57 @@ class PingMonitor:
         else:
             return f"{minutes_part}m"
     
-    def get_progress_bar(self, current_seconds, total_seconds, width=30):
+    @staticmethod
+    def get_progress_bar(current_seconds, total_seconds, width=30):
         """Generate a text progress bar"""
         if total_seconds <= 0:
             return "[Continuous Mode]"
         
-        progress = min(current_seconds / total_seconds, 1.0)
+        progress = current_seconds / total_seconds if current_seconds < total_seconds else 1.0
         filled_width = int(progress * width)
-        bar = "█" * filled_width + "░" * (width - filled_width)
+        bar = _BAR_FULL[:filled_width] + _BAR_EMPTY[:width - filled_width]
         percentage = int(progress * 100)
         return f"[{bar}] {percentage}%"
     
-    def generate_report(self):
+    def generate_report(self, final=True):
         """Generate an HTML report with statistics and drop details"""
-        self.end_time = datetime.datetime.now()
-        uptime = self.end_time - self.start_time
+        now = datetime.datetime.now()
+        if final:
+            self.end_time = now
+        uptime = now - self.start_time
         uptime_str = str(uptime).split('.')[0]  # Remove microseconds
         
         # Calculate statistics
         success_rate = ((self.total_pings - self.dropped_pings) / self.total_pings * 100) if self.total_pings > 0 else 0
-        
-        # Group drops by hour for analysis
-        hourly_drops = {}
-        for drop in self.drops_log:
-            hour = drop['formatted_time'][:13]  # YYYY-MM-DD HH
-            hourly_drops[hour] = hourly_drops.get(hour, 0) + 1
+        loss_rate = (self.dropped_pings / self.total_pings * 100) if self.total_pings > 0 else 0
         
         # Test completion status
         completion_status = "Completed Successfully" if self.check_duration() and self.duration else "Manually Stopped"
         if self.duration and not self.check_duration():
             completion_status = "Interrupted"
+        if not final:
+            completion_status = "In Progress"
         
-        html_content = f"""
+        # Snapshot the hourly histogram maintained by log_drop
+        with self._stats_lock:
+            hourly_drops = sorted(self.hourly_drops.items())
+        
+        # Write to a temporary file and swap it in, so the report is never half-written
+        # A separate connection lets the report thread read while the monitor writes (WAL)
+        temp_file = self.report_file + ".tmp"
+        with contextlib.closing(sqlite3.connect(self.db_file)) as db, open(temp_file, 'wb', buffering=1 << 20) as f:
+            def w(text):
+                f.write(text.encode('utf-8'))
+            
+            w(f"""
 <!DOCTYPE html>
 <html>
 <head>
     <title>Ping Monitor Report - {self.target_name}</title>
     <meta charset="UTF-8">
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background-color: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ background-color: #2c3e50; color: white; padding: 20px; border-radius: 5px; margin-bottom: 20px; }}
-        .config-summary {{ background-color: #3498db; color: white; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-        .system-info {{ background-color: #ecf0f1; padding: 10px; border-radius: 5px; margin-bottom: 20px; font-size: 14px; }}
-        .stats {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin-bottom: 30px; }}
-        .stat-box {{ background-color: #ecf0f1; padding: 15px; border-radius: 5px; text-align: center; }}
-        .stat-number {{ font-size: 24px; font-weight: bold; color: #2c3e50; }}
-        .stat-label {{ color: #7f8c8d; margin-top: 5px; }}
-        .drops-table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        .drops-table th, .drops-table td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-        .drops-table th {{ background-color: #34495e; color: white; }}
-        .drops-table tr:nth-child(even) {{ background-color: #f9f9f9; }}
-        .alert {{ background-color: #e74c3c; color: white; padding: 10px; border-radius: 5px; margin-bottom: 20px; }}
-        .success {{ background-color: #27ae60; color: white; padding: 10px; border-radius: 5px; margin-bottom: 20px; }}
-        .hourly-analysis {{ margin-top: 30px; }}
-        .hourly-table {{ width: 100%; border-collapse: collapse; }}
-        .hourly-table th, .hourly-table td {{ border: 1px solid #ddd; padding: 8px; text-align: center; }}
-        .hourly-table th {{ background-color: #3498db; color: white; }}
-        .footer {{ margin-top: 30px; text-align: center; color: #7f8c8d; font-size: 12px; }}
-    </style>
-</head>
+""")
+            f.write(_REPORT_STYLE)
+            w(f"""</head>
 <body>
     <div class="container">
         <div class="header">
@@ -218,9 +765,9 @@ class PingMonitor:
         </div>
         
         <div class="system-info">
-            <strong>System Info:</strong> {platform.system()} {platform.release()} | 
-            <strong>Python:</strong> {platform.python_version()} | 
-            <strong>Hostname:</strong> {platform.node()}
+            <strong>System Info:</strong> {self._plat[0]} {self._plat[1]} | 
+            <strong>Python:</strong> {self._plat[2]} | 
+            <strong>Hostname:</strong> {self._plat[3]}
         </div>
         
         <div class="stats">
@@ -249,62 +796,51 @@ class PingMonitor:
         {'<div class="alert"><strong>Issue Detected:</strong> Packet loss detected during monitoring period.</div>' if self.dropped_pings > 0 else '<div class="success"><strong>Good News:</strong> No packet loss detected during monitoring period.</div>'}
         
         <h2>Detailed Drop Log</h2>
-        {f'<p>Total packet drops recorded: <strong>{len(self.drops_log)}</strong></p>' if self.drops_log else '<p>No packet drops recorded during monitoring period.</p>'}
-        
-        {'<table class="drops-table"><thead><tr><th>Timestamp</th><th>Consecutive Drops</th><th>Notes</th></tr></thead><tbody>' + ''.join([f'<tr><td>{drop["formatted_time"]}</td><td>{drop["consecutive_count"]}</td><td>{"Start of outage" if drop["consecutive_count"] == 1 else "Ongoing outage"}</td></tr>' for drop in self.drops_log]) + '</tbody></table>' if self.drops_log else ''}
-        
+""")
+            
+            # Drop table, one row per drop
+            if self.dropped_pings:
+                w(f"        <p>Total packet drops recorded: <strong>{self.dropped_pings}</strong></p>\n        \n")
+                if self.dropped_pings > REPORT_DROP_ROWS:
+                    w(f"        <p>Showing the most recent {REPORT_DROP_ROWS:,} drops. The full list is in {self.log_file} and {self.db_file}.</p>\n        \n")
+                w('        <table class="drops-table"><thead><tr><th>Timestamp</th><th>Consecutive Drops</th><th>Notes</th></tr></thead><tbody>')
+                rows = db.execute(
+                    "SELECT strftime('%Y-%m-%d %H:%M:%S', ts, 'unixepoch', 'localtime'), consec,"
+                    " CASE consec WHEN 1 THEN 'Start of outage' ELSE 'Ongoing outage' END"
+                    " FROM (SELECT rowid, ts, consec FROM drops ORDER BY rowid DESC LIMIT ?) ORDER BY rowid",
+                    (REPORT_DROP_ROWS,)
+                )
+                f.writelines(map(str.encode, map(_DROP_ROW, rows)))
+                w('</tbody></table>\n')
+            else:
+                w('        <p>No packet drops recorded during monitoring period.</p>\n')
+            
+            w("""        
         <div class="hourly-analysis">
             <h2>Hourly Drop Analysis</h2>
-            {f'<table class="hourly-table"><thead><tr><th>Hour</th><th>Drops</th></tr></thead><tbody>' + ''.join([f'<tr><td>{hour}</td><td>{count}</td></tr>' for hour, count in sorted(hourly_drops.items())]) + '</tbody></table>' if hourly_drops else '<p>No drops to analyze by hour.</p>'}
-        </div>
+""")
+            if hourly_drops:
+                w('            <table class="hourly-table"><thead><tr><th>Hour</th><th>Drops</th></tr></thead><tbody>')
+                f.writelines(map(str.encode, map(_HOUR_ROW, hourly_drops)))
+                w('</tbody></table>\n')
+            else:
+                w('            <p>No drops to analyze by hour.</p>\n')
+            
+            w(f"""        </div>
         
         <div style="margin-top: 30px; padding: 15px; background-color: #f8f9fa; border-radius: 5px;">
             <h3>Report Summary for ISP</h3>
             <p><strong>Customer Issue:</strong> Intermittent packet loss detected on internet connection.</p>
             <p><strong>Test Method:</strong> Continuous ping monitoring to {self.target_name} ({self.target}) over {uptime_str}.</p>
-            <p><strong>Results:</strong> {self.dropped_pings} packet drops out of {self.total_pings} total pings ({(self.dropped_pings/self.total_pings*100):.3f}% loss rate).</p>
+            <p><strong>Results:</strong> {self.dropped_pings} packet drops out of {self.total_pings} total pings ({loss_rate:.3f}% loss rate).</p>
             <p><strong>Impact:</strong> {'Significant connectivity issues affecting internet usage.' if success_rate < 99 else 'Minor but noticeable connectivity issues.'}</p>
-            <p><strong>System:</strong> {platform.system()} {platform.release()}</p>
+            <p><strong>System:</strong> {self._plat[0]} {self._plat[1]}</p>
         </div>
         
-        <div style="margin-top: 30px; padding: 15px; background-color: #ecf0f1; border-radius: 5px;">
-            <h3>📊 Packet Loss Interpretation Guide</h3>
-            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 15px; margin-top: 15px;">
-                <div style="background-color: #27ae60; color: white; padding: 12px; border-radius: 5px;">
-                    <h4 style="margin: 0 0 8px 0;">🟢 Excellent (99.9%+ success)</h4>
-                    <p style="margin: 0; font-size: 14px;"><strong>0-0.1% packet loss</strong><br>
-                    Normal operation. Occasional single drops expected during network maintenance or brief congestion. No action needed.</p>
-                </div>
-                <div style="background-color: #f39c12; color: white; padding: 12px; border-radius: 5px;">
-                    <h4 style="margin: 0 0 8px 0;">🟡 Good (99.0-99.9% success)</h4>
-                    <p style="margin: 0; font-size: 14px;"><strong>0.1-1% packet loss</strong><br>
-                    Minor issues, possibly during peak usage. Monitor for patterns. Generally acceptable for most uses.</p>
-                </div>
-                <div style="background-color: #e67e22; color: white; padding: 12px; border-radius: 5px;">
-                    <h4 style="margin: 0 0 8px 0;">🟠 Fair (95.0-99.0% success)</h4>
-                    <p style="margin: 0; font-size: 14px;"><strong>1-5% packet loss</strong><br>
-                    Noticeable issues affecting streaming, gaming, video calls. Contact ISP if persistent, especially during off-peak hours.</p>
-                </div>
-                <div style="background-color: #e74c3c; color: white; padding: 12px; border-radius: 5px;">
-                    <h4 style="margin: 0 0 8px 0;">🔴 Poor (<95% success)</h4>
-                    <p style="margin: 0; font-size: 14px;"><strong>>5% packet loss</strong><br>
-                    Significant problems affecting all internet usage. Immediate ISP contact required - indicates serious network issues.</p>
-                </div>
-            </div>
-            
-            <div style="margin-top: 20px; padding: 15px; background-color: white; border-radius: 5px; border-left: 4px solid #3498db;">
-                <h4 style="margin: 0 0 10px 0; color: #2c3e50;">💡 Important Notes:</h4>
-                <ul style="margin: 0; padding-left: 20px; color: #2c3e50;">
-                    <li><strong>100% success is unrealistic</strong> - Network equipment maintenance, routing changes, and brief congestion cause occasional drops</li>
-                    <li><strong>WiFi connections</strong> typically have slightly higher loss rates than wired connections</li>
-                    <li><strong>Peak hours</strong> (7-11 PM) may show increased packet loss due to network congestion</li>
-                    <li><strong>Patterns matter more than totals</strong> - Consistent drops at specific times indicate issues worth investigating</li>
-                    <li><strong>Burst losses</strong> (many consecutive drops) are more concerning than scattered single drops</li>
-                </ul>
-            </div>
-            
-            <div style="margin-top: 15px; padding: 12px; background-color: #d4edda; border-radius: 5px; border-left: 4px solid #28a745;">
-                <p style="margin: 0; color: #155724;"><strong>Your Result: {success_rate:.2f}% success rate</strong> - {'🟢 Excellent network quality' if success_rate >= 99.9 else '🟡 Good network quality with minor issues' if success_rate >= 99.0 else '🟠 Fair network quality - monitor for patterns' if success_rate >= 95.0 else '🔴 Poor network quality - contact ISP immediately'}</p>
+""")
+            f.write(_REPORT_GUIDE)
+            w(f"""            <div style="margin-top: 15px; padding: 12px; background-color: #d4edda; border-radius: 5px; border-left: 4px solid #28a745;">
+                <p style="margin: 0; color: #155724;"><strong>Your Result: {success_rate:.2f}% success rate</strong> - {classify_quality(success_rate)[1]}</p>
             </div>
         </div>
         
@@ -314,22 +850,34 @@ class PingMonitor:
     </div>
 </body>
 </html>
-"""
-        
-        with open(self.report_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+""")
+        os.replace(temp_file, self.report_file)
         
-        print(f"Report generated: {self.report_file}")
+        if final:
+            print(f"Report generated: {self.report_file}")
+    
+    def report_loop(self):
+        """Refresh the HTML report periodically until the monitor stops"""
+        while not self._stop_reports.wait(REPORT_INTERVAL):
+            try:
+                self.generate_report(final=False)
+            except Exception as e:
+                print(f"Error updating report: {e}")
     
     def run(self):
         """Main monitoring loop"""
-        # Clear previous log file
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            f.write(f"Ping Monitor Started - {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Target: {self.target_name} ({self.target})\n")
-            f.write(f"Duration: {self.format_duration(self.duration) if self.duration else 'Continuous'}\n")
-            f.write(f"System: {platform.system()} {platform.release()}\n")
-            f.write("-" * 50 + "\n")
+        # Clear previous log file and keep it open for drop entries
+        self._log_fp = f = open(self.log_file, 'wb', buffering=1 << 16)
+        self.open_database()
+        header = [
+            f"Ping Monitor Started - {self.start_time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Target: {self.target_name} ({self.target})",
+            f"Duration: {self.format_duration(self.duration) if self.duration else 'Continuous'}",
+            f"System: {self._plat[0]} {self._plat[1]}",
+            "-" * 50
+        ]
+        f.write("".join(line + os.linesep for line in header).encode('utf-8'))
+        f.flush()
         
         print(f"\n🔄 Starting ping monitor...")
         print(f"📡 Target: {self.target_name} ({self.target})")
@@ -339,55 +887,47 @@ class PingMonitor:
         print(f"\nPress Ctrl+C to stop monitoring early and generate report")
         print("=" * 60)
         
-        while self.running:
-            # Check if duration has been reached
-            if self.check_duration():
-                print(f"\n⏰ Test duration reached ({self.format_duration(self.duration)})")
-                break
-                
-            timestamp = datetime.datetime.now()
-            self.total_pings += 1
-            
-            if self.ping_once():
-                # Successful ping
-                if self.consecutive_drops > 0:
-                    print(f"✅ Connection restored after {self.consecutive_drops} drops")
-                    self.consecutive_drops = 0
-                
-                # Print status every 60 successful pings (about 1 minute)
-                if self.total_pings % 60 == 0:
-                    elapsed = datetime.datetime.now() - self.start_time
-                    elapsed_str = str(elapsed).split('.')[0]
-                    
-                    if self.duration:
-                        # Calculate remaining time and progress
-                        elapsed_hours = elapsed.total_seconds() / 3600
-                        remaining_hours = max(0, self.duration - elapsed_hours)
-                        remaining_str = self.format_time_remaining(remaining_hours)
-                        
-                        # Progress bar
-                        total_seconds = self.duration * 3600
-                        current_seconds = elapsed.total_seconds()
-                        progress_bar = self.get_progress_bar(current_seconds, total_seconds)
-                        
-                        print(f"📊 {progress_bar}")
-                        print(f"📈 Status: {self.total_pings} pings, {self.dropped_pings} drops ({((self.total_pings-self.dropped_pings)/self.total_pings*100):.1f}% success)")
-                        print(f"⏱️  Elapsed: {elapsed_str} | Remaining: {remaining_str}")
-                    else:
-                        print(f"📊 Status: {self.total_pings} pings, {self.dropped_pings} drops ({((self.total_pings-self.dropped_pings)/self.total_pings*100):.1f}% success) | Elapsed: {elapsed_str}")
+        # Keep the HTML report current while monitoring
+        self._stop_reports.clear()
+        report_thread = threading.Thread(target=self.report_loop, daemon=True)
+        report_thread.start()
+        
+        next_tick = time.monotonic()
+        try:
+            while self.running:
+                # Check if duration has been reached
+                if self.check_duration():
+                    print(f"\n⏰ Test duration reached ({self.format_duration(self.duration)})")
+                    break
                     
-                    print("-" * 60)
-            
-            else:
-                # Dropped ping
-                self.dropped_pings += 1
-                self.consecutive_drops += 1
-                self.max_consecutive_drops = max(self.max_consecutive_drops, self.consecutive_drops)
+                # Send this tick's ping, then collect replies until the next tick
+                self.send_ping()
+                next_tick += PING_INTERVAL
+                for success, sent_time in self.collect_results(next_tick):
+                    self.record_result(success, sent_time)
+                
+                self.flush_log()
                 
-                print(f"❌ {timestamp.strftime('%H:%M:%S')} - Packet drop detected (consecutive: {self.consecutive_drops})")
-                self.log_drop(timestamp)
+                # Sleep out any time left so ping time doesn't drift the cadence
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -PING_INTERVAL:
+                    next_tick = time.monotonic()  # Fell behind; don't burst to catch up
             
-            time.sleep(1)  # 1 second interval
+            # Pings sent in the last few seconds still count, replied or not
+            self.drain_results()
+        finally:
+            # The ping child is in its own session, so nothing else ends it
+            self.stop_ping_process()
+            self.flush_log(force=True)
+            self._log_fp.close()
+            self._db.close()
+            self._stop_reports.set()
+            report_thread.join()
+        
+        if self._icmp_socket is not None:
+            self._icmp_socket.close()
         
         # Generate final report
         elapsed = datetime.datetime.now() - self.start_time
@@ -410,7 +950,7 @@ class PingMonitor:
         print(f"   Server: {self.target_name} ({self.target})")
         print(f"   Duration: {str(elapsed).split('.')[0]} (planned: {self.format_duration(self.duration) if self.duration else 'Continuous'})")
         print(f"   Status: {completion_reason}")
-        print(f"   System: {platform.system()} {platform.release()}")
+        print(f"   System: {self._plat[0]} {self._plat[1]}")
         print()
         
         # Results Section
@@ -424,16 +964,7 @@ class PingMonitor:
         print()
         
         # Network Quality Assessment
-        if success_rate >= 99.9:
-            quality = "🟢 EXCELLENT - No significant issues detected"
-        elif success_rate >= 99.0:
-            quality = "🟡 GOOD - Minor connectivity issues"
-        elif success_rate >= 95.0:
-            quality = "🟠 FAIR - Noticeable connectivity problems"
-        else:
-            quality = "🔴 POOR - Significant connectivity issues"
-        
-        print(f"🎯 NETWORK QUALITY: {quality}")
+        print(f"🎯 NETWORK QUALITY: {classify_quality(success_rate)[0]}")
         print()
         
         print(f"📈 Generating detailed reports...")
@@ -444,12 +975,14 @@ class PingMonitor:
         current_dir = os.path.abspath(".")
         log_path = os.path.join(current_dir, self.log_file)
         report_path = os.path.join(current_dir, self.report_file)
+        db_path = os.path.join(current_dir, self.db_file)
         
         print()
         print("=" * 70)
         print("📁 REPORTS GENERATED:")
         print(f"📄 Text Log: {log_path}")
         print(f"🌐 HTML Report: {report_path}")
+        print(f"🗃️  Drop Database: {db_path}")
         print("=" * 70)
         print("💡 NEXT STEPS:")
         print("   • Open the HTML report in your browser for detailed analysis")
@@ -460,74 +993,55 @@ class PingMonitor:
 
 def select_server():
     """Interactive server selection menu"""
-    servers = [
-        ("8.8.8.8", "Google DNS Primary", "Reliable, global coverage"),
-        ("8.8.4.4", "Google DNS Secondary", "Backup Google DNS"),
-        ("1.1.1.1", "Cloudflare DNS Primary", "Fast, privacy-focused"),
-        ("1.0.0.1", "Cloudflare DNS Secondary", "Backup Cloudflare DNS"),
-        ("9.9.9.9", "Quad9 DNS", "Security and privacy focused"),
-        ("208.67.222.222", "OpenDNS", "Family-safe DNS filtering"),
-        ("208.67.220.220", "OpenDNS Secondary", "Backup OpenDNS")
-    ]
-    
     print("🌍 SERVER SELECTION")
     print("Choose a reliable server for ping testing:")
     print()
     
-    for i, (ip, name, description) in enumerate(servers, 1):
+    for i, (ip, name, description) in enumerate(SERVERS, 1):
         print(f"{i}. {name} ({ip}) - {description}")
     
-    print("8. Enter custom server")
+    # The custom entry comes right after the listed servers
+    choices = [str(i) for i in range(1, len(SERVERS) + 2)]
+    print(f"{choices[-1]}. Enter custom server")
     print()
     
     while True:
         try:
-            choice = input("Choose option (1-8): ").strip()
-            if choice in ['1', '2', '3', '4', '5', '6', '7']:
-                return servers[int(choice)-1][0]
-            elif choice == '8':
+            choice = input(f"Choose option (1-{choices[-1]}): ").strip()
+            if choice in choices[:-1]:
+                return SERVERS[int(choice)-1][0]
+            elif choice == choices[-1]:
                 custom_ip = input("Enter custom IP address: ").strip()
-                # Basic IP validation
-                parts = custom_ip.split('.')
-                if len(parts) == 4 and all(part.isdigit() and 0 <= int(part) <= 255 for part in parts):
+                # Strict dotted-quad IPv4 validation
+                try:
+                    ipaddress.IPv4Address(custom_ip)
                     return custom_ip
-                else:
+                except ValueError:
                     print("❌ Invalid IP address format. Please try again.")
             else:
-                print("❌ Invalid choice. Please select 1-8.")
+                print(f"❌ Invalid choice. Please select 1-{choices[-1]}.")
         except (ValueError, IndexError):
             print("❌ Invalid input. Please try again.")
 
 def select_duration():
     """Interactive duration selection menu"""
-    durations = [
-        (0.5, "30 minutes"),
-        (1, "1 hour"),
-        (2, "2 hours"), 
-        (4, "4 hours"),
-        (8, "8 hours"),
-        (12, "12 hours"),
-        (24, "24 hours (1 day)"),
-        (48, "48 hours (2 days)"),
-        (None, "Continuous (until stopped manually)"),
-        ("custom", "Custom duration")
-    ]
-    
     print("\n⏱️  TEST DURATION SELECTION")
     print("How long should the test run?")
     print()
     
-    for i, (hours, description) in enumerate(durations, 1):
+    for i, (hours, description) in enumerate(DURATIONS, 1):
         print(f"{i}. {description}")
     
     print()
     
+    # The last entry is the custom duration
+    choices = [str(i) for i in range(1, len(DURATIONS) + 1)]
     while True:
         try:
-            choice = input("Choose option (1-10): ").strip()
-            if choice in ['1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                return durations[int(choice)-1][0]
-            elif choice == '10':
+            choice = input(f"Choose option (1-{choices[-1]}): ").strip()
+            if choice in choices[:-1]:
+                return DURATIONS[int(choice)-1][0]
+            elif choice == choices[-1]:
                 # Custom duration input
                 print("\n📝 CUSTOM DURATION")
                 print("Enter duration in one of these formats:")
@@ -541,40 +1055,23 @@ def select_duration():
                     custom_input = input("Enter custom duration: ").strip().lower()
                     
                     try:
-                        # Parse different formats
-                        if 'd' in custom_input and 'h' not in custom_input and 'm' not in custom_input:
-                            # Days only: "2d" or "2 days"
-                            days = float(custom_input.replace('d', '').replace('ays', '').replace('ay', '').strip())
-                            return days * 24
-                        elif 'h' in custom_input and 'm' in custom_input:
-                            # Hours and minutes: "2h 30m"
-                            parts = custom_input.replace('ours', '').replace('our', '').replace('inutes', '').replace('inute', '').replace('ins', '').replace('in', '')
-                            h_part = parts.split('h')[0].strip()
-                            m_part = parts.split('h')[1].replace('m', '').strip()
-                            hours = float(h_part) if h_part else 0
-                            minutes = float(m_part) if m_part else 0
-                            return hours + (minutes / 60)
-                        elif 'h' in custom_input:
-                            # Hours only: "3h" or "3.5h" or "3 hours"
-                            hours = float(custom_input.replace('h', '').replace('ours', '').replace('our', '').strip())
-                            return hours
-                        elif 'm' in custom_input:
-                            # Minutes only: "90m" or "90 minutes"
-                            minutes = float(custom_input.replace('m', '').replace('inutes', '').replace('inute', '').replace('ins', '').replace('in', '').strip())
-                            return minutes / 60
+                        # "1d", "3 hours", "2h 30m", "45 minutes"... or plain decimal hours
+                        match = _DURATION_RE.fullmatch(custom_input)
+                        if match and any(match.groups()):
+                            days, hours, minutes = (float(part) if part else 0.0 for part in match.groups())
+                            hours += days * 24 + minutes / 60
                         else:
-                            # Try to parse as decimal hours
                             hours = float(custom_input)
-                            if hours <= 0:
-                                print("❌ Duration must be greater than 0. Please try again.")
-                                continue
-                            return hours
+                        if hours <= 0:
+                            print("❌ Duration must be greater than 0. Please try again.")
+                            continue
+                        return hours
                     except ValueError:
                         print("❌ Invalid format. Please try again.")
                         print("Examples: '30m', '2h', '1.5h', '2h 30m', '1d'")
                         continue
             else:
-                print("❌ Invalid choice. Please select 1-10.")
+                print(f"❌ Invalid choice. Please select 1-{choices[-1]}.")
         except (ValueError, IndexError):
             print("❌ Invalid input. Please try again.")
 
@@ -584,7 +1081,7 @@ def show_configuration_summary(target, target_name, duration):
     print("✅ CONFIGURATION SUMMARY")
     print("=" * 60)
     print(f"📡 Server: {target_name} ({target})")
-    print(f"⏱️  Duration: {PingMonitor('').format_duration(duration) if duration else 'Continuous (until stopped manually)'}")
+    print(f"⏱️  Duration: {PingMonitor.format_duration(duration) if duration else 'Continuous (until stopped manually)'}")
     print(f"🔄 Interval: 1 second (continuous monitoring)")
     print(f"📄 Log file: ping_drops.log")
     print(f"📊 Report file: ping_report.html")
@@ -594,25 +1091,18 @@ def show_configuration_summary(target, target_name, duration):
     return confirm in ['y', 'yes']
 
 def main():
-    print("=" * 70)
-    print("  PING MONITOR - Network Connectivity Testing Tool")
-    print("  Written by Lee Robinson")
-    print("  GitHub: https://github.com/Lee-Robinson")
-    print("  Repository: https://github.com/Lee-Robinson/ping-monitor")
-    print("=" * 70)
+    sys.stdout.write(_BANNER)
     
     try:
         # Interactive configuration
         target = select_server()
         duration = select_duration()
         
-        # Create monitor instance to get target name
-        temp_monitor = PingMonitor(target)
-        target_name = temp_monitor.get_target_name(target)
+        target_name = get_target_name(target)
         
         # Show configuration summary and get confirmation
         if not show_configuration_summary(target, target_name, duration):
-            print("❌ Test cancelled by user.")
+            print(_MSG_CANCELLED)
             return
         
         # Create and run the monitor
@@ -626,9 +1116,10 @@ def main():
         monitor.run()
         
     except KeyboardInterrupt:
-        print("\n❌ Test interrupted by user.")
+        print(_MSG_INTERRUPTED)
     except Exception as e:
-        print(f"❌ Error: {e}")
+        sys.stdout.flush()  # Keep any pending output ahead of the error
+        sys.stderr.write(f"❌ Error: {e}\n")
         sys.exit(1)
 
 if __name__ == "__main__":